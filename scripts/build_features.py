@@ -29,12 +29,23 @@ def upload_to_s3(local_path, s3_path):
 def build_daily_sentiment(sentiment_df):
     print("Building daily sentiment features...")
 
-    # Robust mixed-format date parsing
-    sentiment_df["date"] = pd.to_datetime(
-        sentiment_df["published"],
-        format="mixed",
-        errors="coerce"
-    ).dt.date
+    # Publish dates are normalized to UTC at ingestion; only rows from
+    # older files without published_utc need the slow mixed-format parse
+    if "published_utc" in sentiment_df.columns:
+        published = pd.to_datetime(sentiment_df["published_utc"], utc=True)
+    else:
+        published = pd.Series(pd.NaT, index=sentiment_df.index, dtype="datetime64[ns, UTC]")
+
+    missing = published.isna()
+    if missing.any():
+        published.loc[missing] = pd.to_datetime(
+            sentiment_df.loc[missing, "published"],
+            format="mixed",
+            errors="coerce",
+            utc=True
+        )
+
+    sentiment_df["date"] = published.dt.date
 
     # Drop rows that couldn't parse
     sentiment_df = sentiment_df.dropna(subset=["date"])
@@ -49,6 +60,15 @@ def build_daily_sentiment(sentiment_df):
     for ticker in unique_tickers:
         df_t = sentiment_df[sentiment_df["tickers"].apply(lambda lst: ticker in lst)]
 
+        # Count a syndicated story once per day, not once per outlet.
+        # Rows from files written before clustering have no cluster_id
+        # and are kept as-is.
+        if "cluster_id" in df_t.columns:
+            df_t = df_t[
+                df_t["cluster_id"].isna()
+                | ~df_t.duplicated(subset=["date", "cluster_id"])
+            ]
+
         agg = df_t.groupby("date").agg(
             mean_sentiment=("sentiment_score", "mean"),
             median_sentiment=("sentiment_score", "median"),
@@ -0,0 +1,151 @@
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+
+# ------------------------------------------
+# CONFIG
+# ------------------------------------------
+
+FULL_PATH = "data/rss_processed_full/sentiment_full.parquet"
+MODEL_DIR = "data/models"
+MODEL_FILE = "cascade_tfidf_lr.joblib"
+
+# First-pass predictions below this probability are escalated to FinBERT
+CONFIDENCE_THRESHOLD = 0.85
+
+FIRST_PASS_TIER = "tfidf_lr"
+FINBERT_TIER = "finbert"
+
+EVAL_THRESHOLDS = [0.6, 0.7, 0.8, 0.85, 0.9, 0.95]
+
+# Each label needs enough articles to appear in both train and held-out splits
+MIN_ROWS_PER_CLASS = 10
+
+
+def ensure_dir(path):
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+
+def build_model():
+    return make_pipeline(
+        TfidfVectorizer(
+            ngram_range=(1, 2),
+            min_df=2,
+            max_features=50000,
+            sublinear_tf=True,
+        ),
+        LogisticRegression(max_iter=1000, class_weight="balanced"),
+    )
+
+
+def load_finbert_labels(path=FULL_PATH):
+    """Articles in the master dataset whose label came from FinBERT itself."""
+    df = pd.read_parquet(path)
+    df = df.dropna(subset=["full_text", "sentiment_label"])
+
+    # Only distill from the teacher, never from earlier first-pass output
+    if "sentiment_tier" in df.columns:
+        df = df[df["sentiment_tier"].fillna(FINBERT_TIER) == FINBERT_TIER]
+
+    # One row per cluster; rows stored before clustering have no cluster_id
+    # and must not collapse into a single NaN "cluster"
+    if "cluster_id" in df.columns:
+        df = df[df["cluster_id"].isna() | ~df.duplicated(subset=["cluster_id"])]
+
+    return df
+
+
+# ------------------------------------------
+# FIRST-PASS SCORING
+# ------------------------------------------
+
+def load_cascade_model():
+    path = os.path.join(MODEL_DIR, MODEL_FILE)
+    if not os.path.exists(path):
+        return None
+    return joblib.load(path)
+
+
+def predict_first_pass(model, texts):
+    """Vectorized first-pass labels and confidences for a batch of texts."""
+    probs = model.predict_proba(list(texts))
+    labels = model.classes_[probs.argmax(axis=1)]
+    return labels, probs.max(axis=1)
+
+
+# ------------------------------------------
+# TRAIN / EVALUATE
+# ------------------------------------------
+
+def evaluate(model, texts, finbert_labels, thresholds=EVAL_THRESHOLDS):
+    """
+    Compare the cascade against FinBERT-only on held-out articles.
+    Escalated articles keep their FinBERT label, so disagreement can
+    only come from confident first-pass predictions.
+    """
+    labels, conf = predict_first_pass(model, texts)
+    finbert_labels = np.asarray(finbert_labels)
+
+    rows = []
+    for threshold in thresholds:
+        accepted = conf >= threshold
+        cascade_labels = np.where(accepted, labels, finbert_labels)
+        rows.append({
+            "threshold": threshold,
+            "agreement": float((cascade_labels == finbert_labels).mean()),
+            "first_pass_accuracy": (
+                float((labels[accepted] == finbert_labels[accepted]).mean())
+                if accepted.any() else np.nan
+            ),
+            "finbert_calls_avoided": float(accepted.mean()),
+        })
+
+    return pd.DataFrame(rows)
+
+
+def train_cascade_model():
+    if not os.path.exists(FULL_PATH):
+        print(f"Master dataset not found: {FULL_PATH} — nothing to train on.")
+        return
+
+    df = load_finbert_labels()
+
+    counts = df["sentiment_label"].value_counts()
+    if len(counts) < 2 or counts.min() < MIN_ROWS_PER_CLASS:
+        print(
+            f"Not enough FinBERT-labeled articles to train the cascade model "
+            f"(need {MIN_ROWS_PER_CLASS} per label, at least 2 labels). "
+            f"Label counts: {counts.to_dict()}"
+        )
+        return
+
+    print(f"Training first-pass model on {len(df)} FinBERT-labeled articles...")
+
+    train_df, test_df = train_test_split(
+        df, test_size=0.2, random_state=42, stratify=df["sentiment_label"]
+    )
+
+    model = build_model()
+    model.fit(train_df["full_text"], train_df["sentiment_label"])
+
+    report = evaluate(model, test_df["full_text"], test_df["sentiment_label"])
+    print("Held-out cascade evaluation vs FinBERT-only:")
+    print(report.to_string(index=False))
+
+    # Refit on everything for production use
+    model.fit(df["full_text"], df["sentiment_label"])
+
+    ensure_dir(MODEL_DIR)
+    path = os.path.join(MODEL_DIR, MODEL_FILE)
+    joblib.dump(model, path)
+    print(f"Saved cascade model: {path}")
+
+
+if __name__ == "__main__":
+    train_cascade_model()
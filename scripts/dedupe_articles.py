@@ -0,0 +1,224 @@
+import os
+import re
+import zlib
+import pickle
+import hashlib
+import datetime
+import numpy as np
+
+# ------------------------------------------
+# CONFIG
+# ------------------------------------------
+
+LSH_DIR = "data/lsh_index"
+LSH_INDEX_FILE = "lsh_index.pkl"
+
+# Estimated Jaccard similarity at or above which two articles are
+# treated as the same story (e.g. one press release syndicated across feeds)
+SIMILARITY_THRESHOLD = 0.7
+
+NUM_PERM = 128
+SHINGLE_SIZE = 3
+
+# Only keep this many days of history in the persisted index
+HISTORY_DAYS = 30
+
+# Smallest prime above 2**32, so (a * x + b) never overflows uint64
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(2**32 - 1)
+
+_rng = np.random.RandomState(42)
+_PERM_A = _rng.randint(1, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def ensure_dir(path):
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+
+# ------------------------------------------
+# MINHASH SIGNATURES
+# ------------------------------------------
+
+def shingles(text):
+    """Lowercased word n-grams of the article text."""
+    if not isinstance(text, str):
+        return set()
+
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+
+    return {
+        " ".join(words[i:i + SHINGLE_SIZE])
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signature(text):
+    """Return a NUM_PERM MinHash signature, or None for empty text."""
+    grams = shingles(text)
+    if not grams:
+        return None
+
+    hv = np.array(
+        [zlib.crc32(g.encode("utf-8")) for g in grams], dtype=np.uint64
+    )
+    hashed = (np.outer(hv, _PERM_A) + _PERM_B) % _PRIME
+    return np.bitwise_and(hashed, _MAX_HASH).min(axis=0)
+
+
+def estimate_similarity(sig_a, sig_b):
+    return float(np.mean(sig_a == sig_b))
+
+
+def choose_bands(threshold, num_perm=NUM_PERM):
+    """
+    Pick (bands, rows) with bands * rows == num_perm whose LSH
+    S-curve midpoint (1 / bands) ** (1 / rows) is closest to threshold.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        midpoint = (1.0 / bands) ** (1.0 / rows)
+        err = abs(midpoint - threshold)
+        if best is None or err < best[0]:
+            best = (err, bands, rows)
+    return best[1], best[2]
+
+
+# ------------------------------------------
+# PERSISTENT LSH INDEX
+# ------------------------------------------
+
+class LSHIndex:
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.bands, self.rows = choose_bands(threshold)
+        self.entries = {}   # key -> (signature, cluster_id, date_str)
+        self.buckets = {}   # (band, band_bytes) -> set of keys
+
+    def _band_keys(self, sig):
+        for b in range(self.bands):
+            chunk = sig[b * self.rows:(b + 1) * self.rows]
+            yield (b, chunk.tobytes())
+
+    def insert(self, key, sig, cluster_id, date_str):
+        self.entries[key] = (sig, cluster_id, date_str)
+        for band_key in self._band_keys(sig):
+            self.buckets.setdefault(band_key, set()).add(key)
+
+    def query(self, sig):
+        """Return the cluster id of the most similar indexed article, if any."""
+        candidates = set()
+        for band_key in self._band_keys(sig):
+            candidates |= self.buckets.get(band_key, set())
+
+        best_sim, best_cluster = 0.0, None
+        for key in candidates:
+            other_sig, cluster_id, _ = self.entries[key]
+            sim = estimate_similarity(sig, other_sig)
+            if sim >= self.threshold and sim > best_sim:
+                best_sim, best_cluster = sim, cluster_id
+
+        return best_cluster
+
+    def prune(self, date_str, history_days=HISTORY_DAYS):
+        """Drop entries older than history_days and rebuild the buckets."""
+        cutoff = (
+            datetime.datetime.strptime(date_str, "%Y-%m-%d")
+            - datetime.timedelta(days=history_days)
+        ).strftime("%Y-%m-%d")
+
+        kept = {k: v for k, v in self.entries.items() if v[2] >= cutoff}
+        if len(kept) == len(self.entries):
+            return
+
+        self.entries = {}
+        self.buckets = {}
+        for key, (sig, cluster_id, entry_date) in kept.items():
+            self.insert(key, sig, cluster_id, entry_date)
+
+
+def load_index(threshold=SIMILARITY_THRESHOLD):
+    path = os.path.join(LSH_DIR, LSH_INDEX_FILE)
+
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            index = pickle.load(f)
+        # Band layout depends on the threshold, so rebuild if it was tuned
+        if index.threshold != threshold:
+            rebuilt = LSHIndex(threshold)
+            for key, (sig, cluster_id, entry_date) in index.entries.items():
+                rebuilt.insert(key, sig, cluster_id, entry_date)
+            index = rebuilt
+        return index
+
+    return LSHIndex(threshold)
+
+
+def save_index(index):
+    ensure_dir(LSH_DIR)
+    path = os.path.join(LSH_DIR, LSH_INDEX_FILE)
+    with open(path, "wb") as f:
+        pickle.dump(index, f)
+
+
+# ------------------------------------------
+# MAIN: assign near-duplicate clusters
+# ------------------------------------------
+
+def _article_key(row):
+    raw = f"{row.get('link', '')}|{row.get('title', '')}|{row.get('published', '')}"
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def assign_clusters(df, date_str, threshold=SIMILARITY_THRESHOLD):
+    """
+    Add a cluster_id column grouping near-duplicate articles by full_text.
+    Articles are matched against each other and against the persisted
+    index of recent days, then added to the index.
+    """
+    index = load_index(threshold)
+    index.prune(date_str)
+
+    cluster_ids = []
+    matched = 0
+
+    for _, row in df.iterrows():
+        key = _article_key(row)
+
+        if key in index.entries:
+            cluster_ids.append(index.entries[key][1])
+            matched += 1
+            continue
+
+        sig = minhash_signature(row["full_text"])
+        if sig is None:
+            cluster_ids.append(key)
+            continue
+
+        cluster_id = index.query(sig)
+        if cluster_id is None:
+            cluster_id = key
+        else:
+            matched += 1
+
+        index.insert(key, sig, cluster_id, date_str)
+        cluster_ids.append(cluster_id)
+
+    df = df.copy()
+    df["cluster_id"] = cluster_ids
+
+    save_index(index)
+
+    print(
+        f"Near-duplicate clustering: {len(df)} articles -> "
+        f"{df['cluster_id'].nunique()} clusters "
+        f"({matched} matched existing clusters, threshold={threshold})"
+    )
+
+    return df
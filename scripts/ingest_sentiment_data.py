@@ -4,6 +4,8 @@ import feedparser
 import pandas as pd
 import requests
 
+from normalize_dates import load_format_cache, parse_published, save_format_cache
+
 # ------------------------------------------
 # CONFIG
 # ------------------------------------------
@@ -35,7 +37,11 @@ def ensure_dir(path):
 # ------------------------------------------
 
 
-def fetch_feed(name, url):
+def fetch_feed(name, url, date_formats=None):
+    """
+    Pull one feed. Returns the articles and the number of non-empty
+    publish dates that could not be parsed.
+    """
     print(f"Pulling feed: {name} ...")
 
     headers = {
@@ -47,7 +53,7 @@ def fetch_feed(name, url):
 
     if resp.status_code != 200:
         print(f"Failed to fetch {name}: HTTP {resp.status_code}")
-        return pd.DataFrame()
+        return pd.DataFrame(), 0
 
     xml_data = resp.text
 
@@ -67,7 +73,20 @@ def fetch_feed(name, url):
             "pulled_at": datetime.datetime.utcnow().isoformat()
         })
 
-    return pd.DataFrame(rows)
+    df = pd.DataFrame(rows)
+
+    # Step 3: normalize `published` once, using the cached format for this source
+    failures = 0
+    if not df.empty:
+        if date_formats is None:
+            date_formats = {}
+        df["published_utc"], failures = parse_published(
+            df["published"], name, date_formats
+        )
+        if failures:
+            print(f"Unparseable publish dates for {name}: {failures}")
+
+    return df, failures
 
 
 def run_ingestion():
@@ -78,11 +97,14 @@ def run_ingestion():
     ensure_dir(OUTPUT_DIR)
 
     all_frames = []
+    date_failures = 0
+    date_formats = load_format_cache()
 
     for name, url in RSS_FEEDS.items():
         try:
-            df = fetch_feed(name, url)
+            df, failures = fetch_feed(name, url, date_formats)
             all_frames.append(df)
+            date_failures += failures
         except Exception as e:
             print(f"Error pulling {name}: {e}")
 
@@ -90,14 +112,17 @@ def run_ingestion():
         print("No RSS feeds could be pulled. Exiting.")
         return
 
+    save_format_cache(date_formats)
+
     final_df = pd.concat(all_frames, ignore_index=True)
 
     # Save to JSON (raw format)
     output_path = os.path.join(OUTPUT_DIR, f"rss_raw_{today}.json")
-    final_df.to_json(output_path, orient="records", indent=2)
+    final_df.to_json(output_path, orient="records", indent=2, date_format="iso")
 
     print(f"Saved RSS data to: {output_path}")
     print(f"Total articles ingested: {len(final_df)}")
+    print(f"Publish date parse failures: {date_failures}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+import os
+import json
+from email.utils import parsedate_to_datetime
+import pandas as pd
+
+# ------------------------------------------
+# CONFIG
+# ------------------------------------------
+
+# Detected `published` format per RSS source, reused across runs
+FORMAT_CACHE_PATH = "data/rss_raw/date_formats.json"
+
+# RFC-822 variants and ISO-8601, tried in order on a sample of each feed
+CANDIDATE_FORMATS = [
+    "%a, %d %b %Y %H:%M:%S %z",
+    "%a, %d %b %Y %H:%M %z",
+    "%d %b %Y %H:%M:%S %z",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%d %H:%M:%S%z",
+]
+
+DETECT_SAMPLE_SIZE = 20
+
+# Re-detect a cached format if it fails on more than this share of rows
+REDETECT_FAILURE_RATE = 0.5
+
+
+def ensure_dir(path):
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+
+def load_format_cache(path=FORMAT_CACHE_PATH):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_format_cache(cache, path=FORMAT_CACHE_PATH):
+    ensure_dir(os.path.dirname(path))
+    with open(path, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+# ------------------------------------------
+# PARSING
+# ------------------------------------------
+
+def _prepare(s):
+    """Map textual UTC zone names onto numeric offsets so %z can parse them."""
+    s = s.fillna("").astype(str).str.strip()
+    s = s.str.replace(r"\s+(?:GMT|UTC|UT)$", " +0000", regex=True)
+    return s.str.replace(r"Z$", "+0000", regex=True)
+
+
+def _parse_with(s, fmt):
+    if fmt is None:
+        return pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns, UTC]")
+    return pd.to_datetime(s, format=fmt, utc=True, errors="coerce")
+
+
+def _parse_single(value):
+    """Slow per-row fallback for values that don't match the source format."""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def detect_format(values):
+    sample = values[values != ""].head(DETECT_SAMPLE_SIZE)
+    if sample.empty:
+        return None
+
+    for fmt in CANDIDATE_FORMATS:
+        if _parse_with(sample, fmt).notna().all():
+            return fmt
+
+    return None
+
+
+def parse_published(series, source, cache):
+    """
+    Parse one source's `published` strings into UTC timestamps.
+
+    The format detected for the source is stored in `cache` so later runs
+    parse the whole column in one vectorized call. Rows that don't match
+    fall back to per-row parsing. Returns (timestamps, failure_count).
+    """
+    s = _prepare(series)
+    present = s != ""
+
+    fmt = cache.get(source)
+    parsed = _parse_with(s, fmt)
+
+    if present.any() and (
+        fmt is None or parsed[present].isna().mean() > REDETECT_FAILURE_RATE
+    ):
+        detected = detect_format(s[present])
+        if detected is not None and detected != fmt:
+            print(f"Detected date format for {source}: {detected}")
+            cache[source] = detected
+            parsed = _parse_with(s, detected)
+
+    mismatch = present & parsed.isna()
+    if mismatch.any():
+        parsed.loc[mismatch] = pd.to_datetime(
+            series[mismatch].map(_parse_single), utc=True, errors="coerce"
+        )
+
+    failures = int((present & parsed.isna()).sum())
+    return parsed, failures
+
+
+def normalize_published(df, cache):
+    """Add a UTC `published_utc` column, parsing each source with its own format."""
+    df = df.copy()
+    df["published_utc"] = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
+
+    total_failures = 0
+    for source, idx in df.groupby("source").groups.items():
+        parsed, failures = parse_published(df.loc[idx, "published"], source, cache)
+        df.loc[idx, "published_utc"] = parsed
+        total_failures += failures
+
+    return df, total_failures
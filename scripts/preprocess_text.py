@@ -0,0 +1,164 @@
+import re
+from functools import lru_cache
+import pandas as pd
+from bs4 import BeautifulSoup
+from transformers import AutoTokenizer
+
+# ------------------------------------------
+# CONFIG
+# ------------------------------------------
+
+MODEL_NAME = "ProsusAI/finbert"
+
+MAX_LENGTH = 512
+# Over-length articles keep this many leading tokens (title + lede) and
+# fill the rest of MAX_LENGTH from the end of the text
+HEAD_TOKENS = 384
+
+# Feed boilerplate appended to the end of RSS summaries by WordPress and
+# similar CMSs. Markers must start a sentence (or be a bare "[…]") and run
+# to the end of the text, with at most a short "at <site>" link text after
+# them, so ordinary words like "spread more" are never cut.
+BOILERPLATE_RE = re.compile(
+    r"(?:"
+    r"\s*\[(?:…|\.\.\.)\]"
+    r"|(?:^|(?<=[.!?…\]])\s*)\b(?:(?:Continue|Keep) reading"
+    r"|Read (?:more|the full (?:story|article)))"
+    r"(?:\s+(?:at|on)(?:\s+[\w.&'-]+){1,3})?"
+    r"(?:\s*(?:→|»|\.\.\.|…))?\.?"
+    r"|(?:^|(?<=[.!?…\]])\s*)\bThe post\b.+?\bappeared first on\b.*"
+    r")+\s*$",
+    flags=re.IGNORECASE,
+)
+
+# (summary, expected) regression cases, checked by running this script
+BOILERPLATE_EXAMPLES = [
+    ("The virus could spread more quickly among patients",
+     "The virus could spread more quickly among patients"),
+    ("Drug X thread more", "Drug X thread more"),
+    ("Analysts keep reading the tea leaves on rates",
+     "Analysts keep reading the tea leaves on rates"),
+    ("Keep reading the tea leaves on rates",
+     "Keep reading the tea leaves on rates"),
+    ("Merck cuts guidance. Continue reading →", "Merck cuts guidance."),
+    ("Lilly posts data. Read more at STAT News", "Lilly posts data."),
+    ("Lilly posts data. Read more…", "Lilly posts data."),
+    ("Pfizer wins approval. The post Pfizer wins approval appeared first on FierceBiotech.com.",
+     "Pfizer wins approval."),
+    ("Trial enrolled 300 patients […] The post X. Y appeared first on Endpoints News.",
+     "Trial enrolled 300 patients"),
+]
+
+# Anything that looks like a tag or an HTML entity
+MARKUP_RE = r"<[a-zA-Z/!]|&#?[a-zA-Z0-9]+;"
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(name=MODEL_NAME):
+    """Load the fast (Rust) tokenizer once per process."""
+    return AutoTokenizer.from_pretrained(name, use_fast=True)
+
+
+# ------------------------------------------
+# HTML + BOILERPLATE CLEANING
+# ------------------------------------------
+
+def strip_html(text):
+    return BeautifulSoup(text, "html.parser").get_text(" ")
+
+
+def clean_series(s, strip_boilerplate=False):
+    """Strip HTML, extra whitespace and optionally feed boilerplate from a text column."""
+    s = s.fillna("").astype(str)
+
+    # Only pay for an HTML parse on rows that actually contain markup
+    has_markup = s.str.contains(MARKUP_RE, regex=True)
+    if has_markup.any():
+        s = s.copy()
+        s.loc[has_markup] = s.loc[has_markup].map(strip_html)
+
+    s = s.str.replace(r"\s+", " ", regex=True).str.strip()
+
+    if strip_boilerplate:
+        s = s.str.replace(BOILERPLATE_RE, "", regex=True)
+
+    return s
+
+
+# ------------------------------------------
+# TOKENIZATION + TRUNCATION POLICY
+# ------------------------------------------
+
+def encode(texts, tokenizer):
+    """Untruncated input_ids per text (including [CLS]/[SEP])."""
+    enc = tokenizer(list(texts), truncation=False, verbose=False)
+    return pd.Series(enc["input_ids"], index=texts.index)
+
+
+def truncate_ids(ids, max_length=MAX_LENGTH, head=HEAD_TOKENS):
+    """Keep the head and tail of an over-length sequence, preserving [CLS]/[SEP]."""
+    if len(ids) <= max_length:
+        return ids
+
+    body = ids[1:-1]
+    keep = max_length - 2
+    head = min(head, keep)
+    tail = body[len(body) - (keep - head):] if keep > head else []
+    return [ids[0]] + body[:head] + tail + [ids[-1]]
+
+
+# ------------------------------------------
+# MAIN: build cleaned full_text + token counts
+# ------------------------------------------
+
+def preprocess_articles(df, tokenizer=None):
+    """
+    Build a cleaned full_text column from title + summary and pre-tokenize
+    it once, storing the untruncated length in token_count.
+
+    Returns the updated frame, the truncated input_ids ready for padding,
+    and the uncleaned text for reporting.
+    """
+    if tokenizer is None:
+        tokenizer = get_tokenizer()
+
+    df = df.copy()
+
+    raw_text = (
+        df["title"].astype(str) + ". " + df["summary"].astype(str)
+    ).str.replace("\n", " ", regex=False).str.strip()
+
+    title = clean_series(df["title"])
+    summary = clean_series(df["summary"], strip_boilerplate=True)
+
+    df["full_text"] = (title + ". " + summary).str.strip()
+    df.loc[summary == "", "full_text"] = title
+
+    ids = encode(df["full_text"], tokenizer)
+    df["token_count"] = ids.map(len)
+    input_ids = ids.map(truncate_ids)
+
+    # Only rows that cleaning actually changed need the raw text tokenized
+    raw_counts = df["token_count"].copy()
+    changed = raw_text != df["full_text"]
+    if changed.any():
+        raw_counts.loc[changed] = encode(raw_text[changed], tokenizer).map(len)
+
+    print(
+        f"Avg tokens per article: {raw_counts.mean():.1f} raw -> "
+        f"{df['token_count'].mean():.1f} cleaned"
+    )
+
+    return df, input_ids, raw_text
+
+
+def check_boilerplate():
+    for text, expected in BOILERPLATE_EXAMPLES:
+        cleaned = BOILERPLATE_RE.sub("", text)
+        if cleaned != expected:
+            raise AssertionError(f"{text!r} -> {cleaned!r}, expected {expected!r}")
+    print(f"All {len(BOILERPLATE_EXAMPLES)} boilerplate examples pass.")
+
+
+if __name__ == "__main__":
+    check_boilerplate()
@@ -1,17 +1,39 @@
 import os
 import json
+import time
 import datetime
 import pandas as pd
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from transformers import AutoModelForSequenceClassification
 import subprocess
 
+from cascade_sentiment import (
+    CONFIDENCE_THRESHOLD, FINBERT_TIER, FIRST_PASS_TIER,
+    load_cascade_model, predict_first_pass,
+)
+from dedupe_articles import assign_clusters
+from normalize_dates import load_format_cache, normalize_published, save_format_cache
+from preprocess_text import (
+    MODEL_NAME, encode, get_tokenizer, preprocess_articles, truncate_ids,
+)
+
 RAW_DIR = "data/rss_raw"
 PROCESSED_DIR = "data/rss_processed"
 FULL_DIR = "data/rss_processed_full"
 
 BUCKET = "healthcare-ml-pipeline"
 
+# Max padded tokens (batch size * longest sequence) per FinBERT forward pass
+BATCH_TOKEN_BUDGET = 8192
+
+# Articles re-run on their raw (uncleaned) text to measure the time cleaning saves
+SAVINGS_SAMPLE_SIZE = 32
+
+# Score confident articles with the TF-IDF first pass, escalate the rest.
+# Opt-in: first-pass probabilities are not calibrated like FinBERT's, so
+# mixing tiers changes the distribution of sentiment_score downstream.
+CASCADE_MODE = False
+
 
 def ensure_dir(path):
     if not os.path.exists(path):
@@ -27,35 +49,85 @@ def upload_to_s3(local_path, s3_path):
 # -----------------------------
 print("Loading FinBERT model...")
 
-tokenizer = AutoTokenizer.from_pretrained("ProsusAI/finbert")
-model = AutoModelForSequenceClassification.from_pretrained("ProsusAI/finbert")
+tokenizer = get_tokenizer()
+model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
 model.eval()
 
 
-def compute_sentiment(text):
-    """Run FinBERT sentiment on text."""
-    if not isinstance(text, str) or len(text.strip()) == 0:
-        return None, None
+def make_batches(order, lengths):
+    """
+    Group sequence positions (already sorted by length) into batches whose
+    padded size stays under BATCH_TOKEN_BUDGET.
+    """
+    batch = []
+    for i in order:
+        length = lengths[i]
+        # Sorted ascending, so this text sets the padded width of the batch
+        if batch and length * (len(batch) + 1) > BATCH_TOKEN_BUDGET:
+            yield batch
+            batch = []
+        batch.append(i)
+
+    if batch:
+        yield batch
+
+
+def compute_sentiment_batch(input_ids):
+    """
+    Run FinBERT on pre-tokenized, pre-truncated sequences, batching similar
+    lengths together. Empty texts ([CLS][SEP] only) get no score.
+    """
+    results = [(None, None)] * len(input_ids)
+    lengths = [len(ids) for ids in input_ids]
+
+    order = sorted(
+        (i for i, n in enumerate(lengths) if n > 2),
+        key=lambda i: lengths[i],
+    )
 
-    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
+    labels = ["negative", "neutral", "positive"]
 
-    with torch.no_grad():
-        outputs = model(**inputs)
+    for batch in make_batches(order, lengths):
+        inputs = tokenizer.pad(
+            {"input_ids": [input_ids[i] for i in batch]},
+            return_tensors="pt",
+        )
 
-    logits = outputs.logits
-    probs = torch.softmax(logits, dim=1).numpy()[0]
+        with torch.no_grad():
+            outputs = model(**inputs)
 
-    labels = ["negative", "neutral", "positive"]
-    sentiment_label = labels[probs.argmax()]
-    sentiment_score = float(probs.max())
+        probs = torch.softmax(outputs.logits, dim=1).numpy()
+
+        for i, p in zip(batch, probs):
+            results[i] = (labels[p.argmax()], float(p.max()))
+
+    return results
 
-    return sentiment_label, sentiment_score
+
+def measure_cleaning_savings(raw_text, input_ids, sample_size=SAVINGS_SAMPLE_SIZE):
+    """
+    Time FinBERT on a sample of articles twice, once on the raw text and once
+    on the cleaned ids, through the same batched path.
+    Returns (raw_seconds, clean_seconds, sample_count).
+    """
+    sample = raw_text.sample(n=min(sample_size, len(raw_text)), random_state=0)
+    raw_ids = encode(sample, tokenizer).map(truncate_ids)
+
+    start = time.perf_counter()
+    compute_sentiment_batch(raw_ids.tolist())
+    raw_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compute_sentiment_batch(input_ids.loc[sample.index].tolist())
+    clean_seconds = time.perf_counter() - start
+
+    return raw_seconds, clean_seconds, len(sample)
 
 
 # -----------------------------
 # MAIN PROCESSOR + APPEND LOGIC
 # -----------------------------
-def process_raw_rss(date_str=None):
+def process_raw_rss(date_str=None, cascade=CASCADE_MODE):
     ensure_dir(PROCESSED_DIR)
     ensure_dir(FULL_DIR)
 
@@ -71,20 +143,103 @@ def process_raw_rss(date_str=None):
 
     df = pd.read_json(raw_path)
 
-    # Full text = title + summary
-    df["full_text"] = df["title"].astype(str) + ". " + df["summary"].astype(str)
-    df["full_text"] = df["full_text"].str.replace("\n", " ", regex=False).str.strip()
+    # Ingestion normalizes publish dates; backfill raw files written before that
+    if "published_utc" in df.columns:
+        df["published_utc"] = pd.to_datetime(
+            df["published_utc"], utc=True, format="ISO8601", errors="coerce"
+        )
+    else:
+        date_formats = load_format_cache()
+        df, failures = normalize_published(df, date_formats)
+        save_format_cache(date_formats)
+        print(f"Publish date parse failures: {failures}")
+
+    # Full text = cleaned title + summary, pre-tokenized once
+    df, input_ids, raw_text = preprocess_articles(df, tokenizer)
 
-    sentiments = []
-    scores = []
+    # Cluster near-duplicate articles (syndicated press releases etc.)
+    df = assign_clusters(df, date_str)
+
+    full_path = os.path.join(FULL_DIR, "sentiment_full.parquet")
 
-    for text in df["full_text"]:
-        label, score = compute_sentiment(text)
-        sentiments.append(label)
-        scores.append(score)
+    if os.path.exists(full_path):
+        print("Loading existing full sentiment dataset...")
+        full_df = pd.read_parquet(full_path)
+    else:
+        print("No full sentiment dataset found — creating new one.")
+        full_df = pd.DataFrame(columns=df.columns)
 
-    df["sentiment_label"] = sentiments
-    df["sentiment_score"] = scores
+    score_cols = ["sentiment_label", "sentiment_score", "sentiment_tier"]
+
+    # Reuse scores for today's clusters already scored on previous days
+    if {"cluster_id", "sentiment_label"} <= set(full_df.columns):
+        known = full_df[full_df["cluster_id"].isin(df["cluster_id"])]
+        known = (
+            known.dropna(subset=["cluster_id", "sentiment_label"])
+            .drop_duplicates(subset=["cluster_id"])
+            .set_index("cluster_id")
+        )
+        if "sentiment_tier" not in known.columns:
+            known["sentiment_tier"] = FINBERT_TIER
+        known["sentiment_tier"] = known["sentiment_tier"].fillna(FINBERT_TIER)
+        known = known[score_cols]
+    else:
+        known = pd.DataFrame(columns=score_cols)
+
+    # Score one representative per cluster, then fan out to members
+    reps = df.drop_duplicates(subset=["cluster_id"])
+    reps = reps[~reps["cluster_id"].isin(known.index)]
+
+    cluster_scores = {}
+
+    # Cascade: cheap first pass, escalate only low-confidence articles
+    cascade_model = load_cascade_model() if cascade else None
+    if cascade and cascade_model is None:
+        print("No cascade model found — scoring everything with FinBERT.")
+
+    if cascade_model is not None and len(reps) > 0:
+        labels, conf = predict_first_pass(cascade_model, reps["full_text"])
+        confident = conf >= CONFIDENCE_THRESHOLD
+
+        for cluster_id, label, score in zip(
+            reps["cluster_id"][confident], labels[confident], conf[confident]
+        ):
+            cluster_scores[cluster_id] = (label, float(score), FIRST_PASS_TIER)
+
+        print(
+            f"First pass resolved {confident.sum()} of {len(reps)} clusters "
+            f"({confident.mean():.0%} FinBERT calls avoided)"
+        )
+        reps = reps[~confident]
+
+    print(f"Running FinBERT on {len(reps)} of {len(df)} articles...")
+
+    start = time.perf_counter()
+    batch_results = compute_sentiment_batch(input_ids.loc[reps.index].tolist())
+    elapsed = time.perf_counter() - start
+
+    for cluster_id, (label, score) in zip(reps["cluster_id"], batch_results):
+        cluster_scores[cluster_id] = (label, score, FINBERT_TIER)
+
+    print(f"Inference: {elapsed:.1f}s on {len(reps)} articles")
+
+    if len(reps) > 0:
+        raw_s, clean_s, n = measure_cleaning_savings(
+            raw_text.loc[reps.index], input_ids
+        )
+        projected = (raw_s - clean_s) / n * len(reps)
+        print(
+            f"Cleaning savings measured on {n} articles: {raw_s:.2f}s raw vs "
+            f"{clean_s:.2f}s cleaned (projected {projected:.1f}s for this run, "
+            f"an estimate)"
+        )
+
+    # Fan cluster scores out to every member article
+    scores = pd.DataFrame.from_dict(
+        cluster_scores, orient="index", columns=score_cols
+    )
+    scores = pd.concat([known, scores])
+    df = df.join(scores, on="cluster_id")
 
     # Save daily processed file
     processed_path = os.path.join(PROCESSED_DIR, f"rss_processed_{date_str}.parquet")
@@ -98,15 +253,6 @@ def process_raw_rss(date_str=None):
     # -----------------------------
     # APPEND INTO FULL MASTER DATASET
     # -----------------------------
-    full_path = os.path.join(FULL_DIR, "sentiment_full.parquet")
-
-    if os.path.exists(full_path):
-        print("Loading existing full sentiment dataset...")
-        full_df = pd.read_parquet(full_path)
-    else:
-        print("No full sentiment dataset found — creating new one.")
-        full_df = pd.DataFrame(columns=df.columns)
-
     # Append
     combined = pd.concat([full_df, df], ignore_index=True)
 
@@ -125,4 +271,7 @@ def process_raw_rss(date_str=None):
 
 
 if __name__ == "__main__":
-    process_raw_rss()
+    # To run with the cascade: python process_sentiment_data.py cascade
+    import sys
+    cascade = len(sys.argv) > 1 and sys.argv[1] == "cascade"
+    process_raw_rss(cascade=cascade or CASCADE_MODE)